@@ -66,7 +66,7 @@ def call(meta: pd.DataFrame,
 def build_results(interactions: pd.DataFrame,
                   mean_analysis: pd.DataFrame,
                   percent_analysis: pd.DataFrame,
-                  clusters_means: dict,
+                  clusters_means: pd.DataFrame,
                   complex_compositions: pd.DataFrame,
                   counts: pd.DataFrame,
                   genes: pd.DataFrame,
@@ -115,8 +115,7 @@ def build_results(interactions: pd.DataFrame,
     mean_analysis = mean_analysis.round(result_precision)
 
     # Round result decimals
-    for key, cluster_means in clusters_means.items():
-        clusters_means[key] = cluster_means.round(result_precision)
+    clusters_means = clusters_means.round(result_precision)
 
     # Document 2
     means_result = pd.concat([interactions_data_result, mean_analysis], axis=1, join='inner', sort=False)
@@ -132,7 +131,7 @@ def build_results(interactions: pd.DataFrame,
     return means_result, significant_means_result, deconvoluted_result
 
 
-def deconvoluted_complex_result_build(clusters_means: dict, interactions: pd.DataFrame,
+def deconvoluted_complex_result_build(clusters_means: pd.DataFrame, interactions: pd.DataFrame,
                                       complex_compositions: pd.DataFrame, counts: pd.DataFrame,
                                       genes: pd.DataFrame) -> pd.DataFrame:
     genes_counts = list(counts.index)
@@ -51,7 +51,7 @@ def call(meta: pd.DataFrame,
 def build_results(interactions: pd.DataFrame,
                   mean_analysis: pd.DataFrame,
                   percent_analysis: pd.DataFrame,
-                  clusters_means: dict,
+                  clusters_means: pd.DataFrame,
                   result_precision: int) -> (pd.DataFrame, pd.DataFrame, pd.DataFrame):
     core_logger.info('Building Simple results')
     interacting_pair = cpdb_statistical_analysis_helper.interacting_pair_build(interactions)
@@ -79,8 +79,7 @@ def build_results(interactions: pd.DataFrame,
     significant_means = significant_means.round(result_precision)
 
     mean_analysis = mean_analysis.round(result_precision)
-    for key, cluster_means in clusters_means.items():
-        clusters_means[key] = cluster_means.round(result_precision)
+    clusters_means = clusters_means.round(result_precision)
 
     # Document 2
     means_result = pd.concat([interactions_data_result, mean_analysis], axis=1, join='inner', sort=False)
@@ -96,7 +95,7 @@ def build_results(interactions: pd.DataFrame,
     return means_result, significant_means_result, deconvoluted_result
 
 
-def deconvoluted_result_build(clusters_means: dict, interactions: pd.DataFrame) -> pd.DataFrame:
+def deconvoluted_result_build(clusters_means: pd.DataFrame, interactions: pd.DataFrame) -> pd.DataFrame:
     deconvoluted_result_1 = pd.DataFrame()
     deconvoluted_result_2 = pd.DataFrame()
     deconvoluted_result_1[
@@ -56,8 +56,11 @@ def call(meta: pd.DataFrame,
                                                                                cluster_interactions,
                                                                                base_result)
 
+    interactions_rows = cpdb_statistical_analysis_helper.get_interactions_rows(interactions_processed,
+                                                                               clusters['gene_to_row'])
+
     statistical_mean_analysis = cpdb_statistical_analysis_helper.shuffled_analysis(iterations, meta, counts_filtered,
-                                                                                   interactions_processed,
+                                                                                   interactions_rows,
                                                                                    cluster_interactions, base_result,
                                                                                    threads)
 
@@ -82,7 +85,7 @@ def call(meta: pd.DataFrame,
 def build_results(interactions: pd.DataFrame,
                   real_mean_analysis: pd.DataFrame,
                   result_percent: pd.DataFrame,
-                  clusters_means: dict,
+                  clusters_means: pd.DataFrame,
                   complex_compositions: pd.DataFrame,
                   counts: pd.DataFrame,
                   genes: pd.DataFrame,
@@ -132,8 +135,7 @@ def build_results(interactions: pd.DataFrame,
     significant_means = significant_means.round(result_precision)
 
     # Round result decimals
-    for key, cluster_means in clusters_means.items():
-        clusters_means[key] = cluster_means.round(result_precision)
+    clusters_means = clusters_means.round(result_precision)
 
     # Document 1
     pvalues_result = pd.concat([interactions_data_result, result_percent], axis=1, join='inner', sort=False)
@@ -157,7 +159,7 @@ def build_results(interactions: pd.DataFrame,
     return pvalues_result, means_result, significant_mean_result, mean_pvalue_result, deconvoluted_result
 
 
-def deconvoluted_complex_result_build(clusters_means: dict, interactions: pd.DataFrame,
+def deconvoluted_complex_result_build(clusters_means: pd.DataFrame, interactions: pd.DataFrame,
                                       complex_compositions: pd.DataFrame, counts: pd.DataFrame,
                                       genes: pd.DataFrame) -> pd.DataFrame:
     genes_counts = list(counts.index)
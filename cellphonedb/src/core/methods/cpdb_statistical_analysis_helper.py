@@ -1,12 +1,19 @@
 import itertools
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from multiprocessing.pool import Pool
 
 import numpy as np
 import pandas as pd
 
 from cellphonedb.src.core.core_logger import core_logger
 
+GROUP_NAMES = ['tumor', 'normal']
+
+try:
+    from cellphonedb.src.core.methods import cpdb_statistical_analysis_kernels
+except ImportError:  # numba is optional, the NumPy implementation is used without it
+    cpdb_statistical_analysis_kernels = None
+
 
 def get_significant_means(real_mean_analysis: pd.DataFrame, result_percent: pd.DataFrame) -> pd.DataFrame:
     """
@@ -37,25 +44,12 @@ def get_significant_means(real_mean_analysis: pd.DataFrame, result_percent: pd.D
     ensembl2    2.0         0.1         NaN
     ensembl3    NaN         NaN         0.5
     """
-    significant_means = real_mean_analysis.copy()
     min_significant_mean = 0.05
-    for index, mean_analysis in real_mean_analysis.iterrows():
-        for cluster_interaction in list(result_percent.columns):
-            if result_percent.at[index, cluster_interaction] > min_significant_mean:
-                significant_means.at[index, cluster_interaction] = pd.np.nan
+    result_percent = result_percent.reindex_like(real_mean_analysis)
+    significant_means = real_mean_analysis.mask(result_percent > min_significant_mean)
     return significant_means
 
 
-def shuffle_meta(meta: pd.DataFrame) -> pd.DataFrame:
-    """
-    Permutates the meta values aleatory generating a new meta file
-    """
-    meta_copy = meta.copy()
-    pd.np.random.shuffle(meta_copy['cell_type'])
-
-    return meta_copy
-
-
 def build_clusters(meta: pd.DataFrame, counts: pd.DataFrame) -> dict:
     """
     Builds a cluster structure and calculates the means values
@@ -63,46 +57,82 @@ def build_clusters(meta: pd.DataFrame, counts: pd.DataFrame) -> dict:
     cluster_names = meta['cell_type'].drop_duplicates().tolist()
     group_names = meta['group'].drop_duplicates().tolist() # must be list of "tumor" & "normal"
 
-    clusters = {'names': cluster_names, 'groups': group_names, 'counts': {}, 'means': {}}
+    clusters = {'names': cluster_names, 'groups': group_names, 'counts': {}, 'means': pd.DataFrame()}
 
     cluster_counts = {}
-    cluster_means = {}
-    cluster_de_means = {}
 
     for cluster_name in cluster_names:
         for group_name in group_names:
             cells = meta[(meta['cell_type'] == cluster_name) & (meta['group'] == group_name)].index
-            cluster_count = counts.loc[:, cells]
-            cluster_counts[cluster_name, group_name] = cluster_count
-            cluster_means[cluster_name, group_name] = cluster_count.apply(lambda count: count.mean(), axis=1)
-        # cluster_de_means[cluster_name] = cluster_means[cluster_name, 'tumor'] / cluster_means[cluster_name, 'normal']
-        cluster_de_means[cluster_name] = np.log2((cluster_means[cluster_name, 'tumor'] / cluster_means[cluster_name, 'normal']))
-   
+            cluster_counts[cluster_name, group_name] = counts.loc[:, cells]
+
+    cluster_labels, group_labels = get_cluster_group_labels(meta, sorted(cluster_names))
+    counts_values = np.ascontiguousarray(counts.loc[:, meta.index].values, dtype=np.float64)
+    cluster_means = cluster_group_means(counts_values, cluster_labels, group_labels, len(cluster_names))
+    means_values = de_means_values(cluster_means)
+    means = pd.DataFrame(means_values, index=counts.index, columns=sorted(cluster_names))
+
     clusters['counts'] = cluster_counts
-    clusters['means'] = cluster_de_means
+    clusters['means'] = means
+    clusters['means_values'] = means_values
+    clusters['gene_to_row'] = {gene: row for row, gene in enumerate(means.index)}
 
     return clusters
 
-def build_clusters_ori(meta: pd.DataFrame, counts: pd.DataFrame) -> dict:
+
+def get_cluster_group_labels(meta: pd.DataFrame, cluster_names: list) -> (np.ndarray, np.ndarray):
     """
-    Builds a cluster structure and calculates the means values
+    Returns the cluster_names position of each cell cluster and the GROUP_NAMES position of each cell group.
+
+    Cells out of GROUP_NAMES are labeled as -1
     """
-    cluster_names = meta['cell_type'].drop_duplicates().tolist()
-    clusters = {'names': cluster_names, 'counts': {}, 'means': {}}
+    cluster_labels = pd.Categorical(meta['cell_type'], categories=cluster_names).codes
+    group_labels = pd.Categorical(meta['group'], categories=GROUP_NAMES).codes
 
-    cluster_counts = {}
-    cluster_means = {}
+    return cluster_labels, group_labels
 
-    for cluster_name in cluster_names:
-        cells = meta[meta['cell_type'] == cluster_name].index
-        cluster_count = counts.loc[:, cells]
-        cluster_counts[cluster_name] = cluster_count
-        cluster_means[cluster_name] = cluster_count.apply(lambda count: count.mean(), axis=1)
 
-    clusters['counts'] = cluster_counts
-    clusters['means'] = cluster_means
+def cluster_group_means(counts_values: np.ndarray, cluster_labels: np.ndarray, group_labels: np.ndarray,
+                        clusters_number: int) -> np.ndarray:
+    """
+    Calculates the mean counts of each cluster and group as a (genes, clusters, groups) array.
 
-    return clusters
+    Uses the compiled kernel to sum the counts of each cluster and group if numba is installed. If not, builds a
+    (cells, clusters * groups) one-hot membership matrix, so all the sums are one matrix product. Empty cluster
+    groups are NaN.
+    """
+    groups_number = len(GROUP_NAMES)
+    labels_number = clusters_number * groups_number
+    labels = np.where(group_labels >= 0, cluster_labels.astype(np.int64) * groups_number + group_labels, -1)
+    cells = np.flatnonzero(labels >= 0)
+
+    if cpdb_statistical_analysis_kernels is not None:
+        sums = cpdb_statistical_analysis_kernels.cluster_group_sums(counts_values, labels, labels_number)
+    else:
+        membership = np.zeros((len(labels), labels_number), dtype=counts_values.dtype)
+        membership[cells, labels[cells]] = 1
+        sums = counts_values.dot(membership)
+
+    cells_number = np.bincount(labels[cells], minlength=labels_number).astype(counts_values.dtype)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / cells_number
+
+    return means.reshape(-1, clusters_number, groups_number)
+
+
+def de_means_values(cluster_means: np.ndarray) -> np.ndarray:
+    """
+    Calculates the log2 tumor/normal mean ratio of each gene and cluster as a (genes, clusters) array.
+
+    The ratio is NaN if the normal mean is 0 or NaN
+    """
+    tumor_means = cluster_means[:, :, 0]
+    normal_means = cluster_means[:, :, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        de_means = np.log2(np.where(normal_means > 0, tumor_means / normal_means, np.nan))
+
+    return de_means
 
 
 def filter_counts_by_interactions(counts: pd.DataFrame, interactions: pd.DataFrame,
@@ -125,7 +155,7 @@ def filter_empty_cluster_counts(counts: pd.DataFrame) -> pd.DataFrame:
     if counts.empty:
         return counts
 
-    filtered_counts = counts[counts.apply(lambda row: row.sum() > 0, axis=1)]
+    filtered_counts = counts[counts.values.sum(axis=1) > 0]
     return filtered_counts
 
 
@@ -134,10 +164,11 @@ def mean_pvalue_result_build(real_mean_analysis: pd.DataFrame, result_percent: p
     """
     Merges the pvalues and means in one table
     """
-    mean_pvalue_result = pd.DataFrame(index=real_mean_analysis.index)
-    for interaction_cluster in real_mean_analysis.columns.values:
-        mean_pvalue_result[interaction_cluster] = real_mean_analysis[interaction_cluster].astype(str).str.cat(
-            result_percent[interaction_cluster].astype(str), sep=' | ')
+    means = real_mean_analysis.astype(str).values.astype(str)
+    pvalues = result_percent.reindex_like(real_mean_analysis).astype(str).values.astype(str)
+
+    mean_pvalue_result = pd.DataFrame(np.char.add(np.char.add(means, ' | '), pvalues),
+                                      index=real_mean_analysis.index, columns=real_mean_analysis.columns)
 
     mean_pvalue_result = pd.concat([interactions_data_result, mean_pvalue_result], axis=1, join='inner', sort=False)
 
@@ -166,16 +197,36 @@ def build_result_matrix(interactions: pd.DataFrame, cluster_interactions: list)
     """
     builds an empty cluster matrix to fill it later
     """
-    columns = []
-
-    for cluster_interaction in cluster_interactions:
-        columns.append('{}_{}'.format(cluster_interaction[0], cluster_interaction[1]))
+    columns = get_cluster_interactions_labels(cluster_interactions)
 
     result = pd.DataFrame(index=interactions.index, columns=columns, dtype=float)
 
     return result
 
 
+def get_cluster_interactions_labels(cluster_interactions: list) -> list:
+    """
+    Returns the result column label of each cluster interaction
+    """
+    return ['{}_{}'.format(cluster_interaction[0], cluster_interaction[1]) for cluster_interaction in
+            cluster_interactions]
+
+
+def get_cluster_interactions_columns(cluster_names: list, cluster_interactions: list) -> (np.ndarray, np.ndarray):
+    """
+    Returns the sorted cluster_names position of the first and second cluster of each cluster interaction.
+
+    Means and percents arrays have their clusters sorted by name
+    """
+    cluster_columns = {cluster_name: column for column, cluster_name in enumerate(sorted(cluster_names))}
+    receptor_clusters = np.array([cluster_columns[cluster_interaction[0]] for cluster_interaction in
+                                  cluster_interactions], dtype=int)
+    ligand_clusters = np.array([cluster_columns[cluster_interaction[1]] for cluster_interaction in
+                                cluster_interactions], dtype=int)
+
+    return receptor_clusters, ligand_clusters
+
+
 def mean_analysis(interactions: pd.DataFrame, clusters: dict, cluster_interactions: list,
                   base_result: pd.DataFrame, suffixes: tuple = ('_1', '_2')) -> pd.DataFrame:
     """
@@ -203,17 +254,43 @@ def mean_analysis(interactions: pd.DataFrame, clusters: dict, cluster_interactio
 
         results with * are 0 because one of both components is 0.
     """
-    result = base_result.copy()
-
-    for interaction_index, interaction in interactions.iterrows():
-        for cluster_interaction in cluster_interactions:
-            cluster_interaction_string = '{}_{}'.format(cluster_interaction[0], cluster_interaction[1])
-            interaction_mean = cluster_interaction_mean(cluster_interaction, interaction, clusters['means'], suffixes)
-            result.at[interaction_index, cluster_interaction_string] = interaction_mean
+    receptors, ligands = get_interactions_rows(interactions, clusters['gene_to_row'], suffixes)
+    receptor_clusters, ligand_clusters = get_cluster_interactions_columns(clusters['names'], cluster_interactions)
+    interaction_means = mean_analysis_values(clusters['means_values'], receptors, ligands, receptor_clusters,
+                                             ligand_clusters)
+    result = pd.DataFrame(interaction_means, index=base_result.index, columns=base_result.columns)
 
     return result
 
 
+def get_interactions_rows(interactions: pd.DataFrame, gene_to_row: dict, suffixes: tuple = ('_1', '_2')) -> (
+        np.ndarray, np.ndarray):
+    """
+    Returns the means row of the first and second component of each interaction
+    """
+    receptors = interactions['ensembl{}'.format(suffixes[0])].map(gene_to_row).values
+    ligands = interactions['ensembl{}'.format(suffixes[1])].map(gene_to_row).values
+
+    return receptors, ligands
+
+
+def mean_analysis_values(means_values: np.ndarray, receptors: np.ndarray, ligands: np.ndarray,
+                         receptor_clusters: np.ndarray, ligand_clusters: np.ndarray,
+                         out: np.ndarray = None) -> np.ndarray:
+    """
+    Calculates the mean_analysis values as an (interactions, cluster_interactions) array from the (genes, clusters)
+    means, the interactions components rows and the cluster interactions columns.
+
+    If out is given, the values are written in it instead of a new array
+    """
+    means_receptors = means_values[receptors]
+    means_ligands = means_values[ligands]
+    interaction_means = np.add(means_receptors[:, receptor_clusters], means_ligands[:, ligand_clusters], out=out)
+    interaction_means /= 2
+
+    return interaction_means
+
+
 def percent_analysis(clusters: dict, threshold: float, interactions: pd.DataFrame, cluster_interactions: list,
                      base_result: pd.DataFrame, suffixes: tuple = ('_1', '_2')) -> pd.DataFrame:
     """
@@ -253,74 +330,107 @@ def percent_analysis(clusters: dict, threshold: float, interactions: pd.DataFram
 
 
     """
-    result = base_result.copy()
     percents = {}
 
     # percents calculation
     for cluster_name in clusters['names']:
         counts_tumor = clusters['counts'][cluster_name, 'tumor']
         counts_normal = clusters['counts'][cluster_name, 'normal']
-        percent_tumor = counts_tumor.apply(lambda count: counts_percent(counts_tumor, threshold), axis=1)
-        percent_normal = counts_normal.apply(lambda count: counts_percent(counts_normal, threshold), axis=1)
+        percent_tumor = counts_below_threshold(counts_tumor, threshold)
+        percent_normal = counts_below_threshold(counts_normal, threshold)
 
         percents[cluster_name] = percent_tumor & percent_normal
 
-    for interaction_index, interaction in interactions.iterrows():
+    percents_values = np.column_stack([percents[cluster_name] for cluster_name in sorted(clusters['names'])])
+    receptors, ligands = get_interactions_rows(interactions, clusters['gene_to_row'], suffixes)
+    receptor_clusters, ligand_clusters = get_cluster_interactions_columns(clusters['names'], cluster_interactions)
 
-        for cluster_interaction in cluster_interactions:
-            cluster_interaction_string = '{}_{}'.format(cluster_interaction[0], cluster_interaction[1])
+    percents_receptors = percents_values[receptors]
+    percents_ligands = percents_values[ligands]
+    interaction_percents = ~(percents_receptors[:, receptor_clusters] | percents_ligands[:, ligand_clusters])
 
-            interaction_percent = cluster_interaction_percent(cluster_interaction, interaction, percents, suffixes)
-            result.at[interaction_index, cluster_interaction_string] = interaction_percent
+    result = pd.DataFrame(interaction_percents.astype(float), index=base_result.index, columns=base_result.columns)
 
     return result
 
 
-def shuffled_analysis(iterations: int, meta: pd.DataFrame, counts: pd.DataFrame, interactions: pd.DataFrame,
-                      cluster_interactions: list, base_result: pd.DataFrame, threads: int,
-                      suffixes: tuple = ('_1', '_2')) -> list:
+def counts_below_threshold(counts: pd.DataFrame, threshold: float) -> np.ndarray:
+    """
+    Returns if the percent of cells expressing each gene is below threshold.
+
+    Genes of a counts without cells are never below threshold
     """
-    Shuffles meta and calculates the means for each and saves it in a list.
+    if counts.shape[1] == 0:
+        return np.zeros(len(counts), dtype=bool)
+
+    return (counts.values > 0).mean(axis=1) < threshold
 
-    Runs it in a multiple threads to run it fasters
+
+def shuffled_analysis(iterations: int, meta: pd.DataFrame, counts: pd.DataFrame, interactions_rows: tuple,
+                      cluster_interactions: list, base_result: pd.DataFrame, threads: int) -> np.ndarray:
+    """
+    Shuffles meta and calculates the means for each and saves it in an (iterations, interactions,
+    cluster_interactions) array.
+
+    interactions_rows are the counts rows of the interactions components (see get_interactions_rows)
+
+    Runs it in a multiple threads to run it fasters. The heavy work is NumPy code that releases the GIL, and
+    threads share the counts without copying them
     """
     core_logger.info('Running Statistical Analysis')
-    with Pool(processes=threads) as pool:
+    # Seeds are taken from the global random state so debug_seed keeps the permutations reproducible
+    iteration_seeds = np.random.randint(np.iinfo(np.int32).max, size=iterations)
+
+    cluster_names = sorted(meta['cell_type'].drop_duplicates())
+    cluster_labels, group_labels = get_cluster_group_labels(meta, cluster_names)
+    # pandas keeps the values transposed, C order makes each gene row contiguous for the kernel
+    counts_values = np.ascontiguousarray(counts.loc[:, meta.index].values, dtype=np.float32)
+    receptors, ligands = interactions_rows
+    receptor_clusters, ligand_clusters = get_cluster_interactions_columns(cluster_names, cluster_interactions)
+
+    results = np.empty((iterations,) + base_result.shape, dtype=np.float32)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
         statistical_analysis_thread = partial(_statistical_analysis,
-                                               base_result,
-                                               cluster_interactions,
-                                               counts,
-                                               interactions,
-                                               meta,
-                                               suffixes
-                                               )
-        results = pool.map(statistical_analysis_thread, range(iterations))
+                                              results,
+                                              counts_values,
+                                              cluster_labels,
+                                              group_labels,
+                                              len(cluster_names),
+                                              receptors,
+                                              ligands,
+                                              receptor_clusters,
+                                              ligand_clusters
+                                              )
+        # Each thread fills its own iteration slice, list() only waits for them and raises their errors
+        list(executor.map(statistical_analysis_thread, range(iterations), iteration_seeds))
 
     return results
 
 
-def _statistical_analysis(base_result, cluster_interactions, counts, interactions, meta, suffixes,
-                          iteration_number) -> pd.DataFrame:
+def _statistical_analysis(results: np.ndarray, counts_values: np.ndarray, cluster_labels: np.ndarray,
+                          group_labels: np.ndarray, clusters_number: int, receptors: np.ndarray, ligands: np.ndarray,
+                          receptor_clusters: np.ndarray, ligand_clusters: np.ndarray, iteration_number: int,
+                          iteration_seed: int) -> None:
     """
-    Shuffles meta dataset and calculates calculates the means
+    Shuffles the cells cluster labels and calculates the means into the iteration_number slice of results
     """
-    shuffled_meta = shuffle_meta(meta)
-    shuffled_clusters = build_clusters(shuffled_meta, counts)
-    result_mean_analysis = mean_analysis(interactions, shuffled_clusters, cluster_interactions, base_result, suffixes)
-    return result_mean_analysis
+    shuffled_cluster_labels = np.random.RandomState(iteration_seed).permutation(cluster_labels)
+    shuffled_means = cluster_group_means(counts_values, shuffled_cluster_labels, group_labels, clusters_number)
+    mean_analysis_values(de_means_values(shuffled_means), receptors, ligands, receptor_clusters, ligand_clusters,
+                         out=results[iteration_number])
 
 
 def build_percent_result(real_mean_analysis: pd.DataFrame, real_perecents_analysis: pd.DataFrame,
-                         statistical_mean_analysis: list, interactions: pd.DataFrame, cluster_interactions: list,
+                         statistical_mean_analysis: np.ndarray, interactions: pd.DataFrame, cluster_interactions: list,
                          base_result: pd.DataFrame) -> pd.DataFrame:
     """
     Calculates the pvalues after statistical analysis.
 
-    If real_percent or real_mean are zero, result_percent is 1
+    If real_percent or real_mean are zero or all the shuffled means are empty, result_percent is 1
 
     If not:
-    Calculates how many shuffled means are bigger than real mean and divides it for the number of
-    the total iterations
+    Calculates how many shuffled means are bigger (smaller for negative real means) than real mean, divides it
+    for the number of non empty shuffled means and doubles it (two-tails)
 
     EXAMPLE:
         INPUT:
@@ -336,16 +446,13 @@ def build_percent_result(real_mean_analysis: pd.DataFrame, real_perecents_analys
         interaction1  1                   0
         interaction2  0                   1
 
-        statistical means:
+        statistical means (iterations, interactions, cluster interactions):
         [
-                        cluster1_cluster1   cluster1_cluster2 ...
-        interaction1    0.6                 0.1
-        interaction2    0.0                 0.2
+            [[0.6, 0.1],
+             [0.0, 0.2]],
 
-        ,
-                      cluster1_cluster1   cluster1_cluster2 ...
-        interaction1  0.5                 0.4
-        interaction2  0.0                 0.6
+            [[0.5, 0.4],
+             [0.0, 0.6]]
         ]
 
         iterations = 2
@@ -355,67 +462,64 @@ def build_percent_result(real_mean_analysis: pd.DataFrame, real_perecents_analys
 
                         cluster1_cluster1   cluster1_cluster2 ...
         interaction1    1                   1
-        interaction2    1                   0.5
+        interaction2    1                   1
 
 
     """
     core_logger.info('Building Pvalues result')
-    percent_result = base_result.copy()
-
-    for interaction_index, interaction in interactions.iterrows():
-        for cluster_interaction in cluster_interactions:
-            cluster_interaction_string = '{}_{}'.format(cluster_interaction[0], cluster_interaction[1])
-            real_mean = real_mean_analysis.at[interaction_index, cluster_interaction_string]
-            real_percent = real_perecents_analysis.at[interaction_index, cluster_interaction_string]
-            # print(real_mean)
-            # print(real_percent)
-            if int(real_percent) == 0 or real_mean == 0:
-                result_percent = 1.0
-        
-            else:
-                # cellnet
-                mean_per_pair = []
-                
-                for statistical_mean in statistical_mean_analysis:
-                    mean = statistical_mean.at[interaction_index, cluster_interaction_string]
-                    mean_per_pair.append(mean)
-
-                mean_per_pair = [x for x in mean_per_pair if ~np.isnan(x)]
-                mean_per_pair = np.array(mean_per_pair)
-                # mean_per_pair.sort()
-
-                # mean_at_975 = np.percentile(mean_per_pair, 97.5)
-                # mean_at_25 = np.percentile(mean_per_pair, 2.5)
-                # print(np.percentile(mean_per_pair, 2.5), np.percentile(mean_per_pair, 50), np.percentile(mean_per_pair, 97.5))
-                if real_mean > 0:
-                    shuffled_bigger_smaller = len(mean_per_pair[mean_per_pair > real_mean])                     
-                    result_percent = shuffled_bigger_smaller / len(mean_per_pair)
-                    result_percent = result_percent * 2 # two-tails
-                elif real_mean < 0:
-                    shuffled_bigger_smaller = len(mean_per_pair[mean_per_pair < real_mean]) 
-                    result_percent = shuffled_bigger_smaller / len(mean_per_pair)
-                    result_percent = result_percent * 2 # two-tails
-
-            percent_result.at[interaction_index, cluster_interaction_string] = result_percent
-
-        
+    real_means = real_mean_analysis.values
+    real_percents = real_perecents_analysis.values
+
+    shuffled_means = statistical_mean_analysis.astype(np.float32, copy=False)
+
+    # Real means are compared in float32 like the shuffled ones, so equal means stay ties
+    shuffled_total, shuffled_bigger, shuffled_smaller = shuffled_means_counts(shuffled_means,
+                                                                              real_means.astype(np.float32))
+    with np.errstate(invalid='ignore'):
+        shuffled_bigger_smaller = np.where(real_means > 0, shuffled_bigger, shuffled_smaller)
+
+    result_percent = shuffled_bigger_smaller / np.maximum(shuffled_total, 1)
+    result_percent = result_percent * 2  # two-tails
+
+    no_analysis = (real_percents.astype(int) == 0) | (real_means == 0) | np.isnan(real_means) | (shuffled_total == 0)
+    result_percent = np.where(no_analysis, 1.0, result_percent)
+
+    percent_result = pd.DataFrame(result_percent, index=base_result.index, columns=base_result.columns)
+
     return percent_result
 
 
+def shuffled_means_counts(shuffled_means: np.ndarray, real_means: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Counts the shuffled means that are not NaN, bigger and smaller than the real means along the iterations axis.
+
+    Uses the compiled kernel if numba is installed
+    """
+    if cpdb_statistical_analysis_kernels is not None:
+        return cpdb_statistical_analysis_kernels.shuffled_means_counts(shuffled_means, real_means)
+
+    # NaN shuffled means are never bigger or smaller, so only the total needs the NaN check
+    with np.errstate(invalid='ignore'):
+        total = len(shuffled_means) - np.count_nonzero(np.isnan(shuffled_means), axis=0)
+        bigger = np.count_nonzero(shuffled_means > real_means, axis=0)
+        smaller = np.count_nonzero(shuffled_means < real_means, axis=0)
+
+    return total, bigger, smaller
+
+
 def interacting_pair_build(interactions: pd.DataFrame) -> pd.Series:
     """
     Returns the interaction result formated with prefixes
     """
 
-    def get_interactor_name(interaction: pd.Series, suffix: str) -> str:
-        if interaction['is_complex{}'.format(suffix)]:
-            return interaction['name{}'.format(suffix)]
+    def get_interactor_name(suffix: str) -> pd.Series:
+        interactor_name = np.where(interactions['is_complex{}'.format(suffix)].astype(bool),
+                                   interactions['name{}'.format(suffix)],
+                                   interactions['gene_name{}'.format(suffix)])
 
-        return interaction['gene_name{}'.format(suffix)]
+        return pd.Series(interactor_name, index=interactions.index).astype(str)
 
-    interacting_pair = interactions.apply(
-        lambda interaction: '{}_{}'.format(get_interactor_name(interaction, '_1'),
-                                           get_interactor_name(interaction, '_2')), axis=1)
+    interacting_pair = get_interactor_name('_1').str.cat(get_interactor_name('_2'), sep='_')
 
     interacting_pair.rename('interacting_pair', inplace=True)
 
@@ -435,71 +539,3 @@ def build_significant_means(real_mean_analysis: pd.DataFrame, result_percent: pd
     significant_mean_rank.name = 'rank'
     return significant_mean_rank, significant_means
 
-
-def cluster_interaction_percent(cluster_interaction: tuple, interaction: pd.Series, clusters_percents: dict,
-                                suffixes: tuple = ('_1', '_2')) -> int:
-    """
-    If one of both is not 0 the result is 0 other cases are 1
-    """
-
-    percent_cluster_receptors = clusters_percents[cluster_interaction[0]]
-    percent_cluster_ligands = clusters_percents[cluster_interaction[1]]
-
-    percent_receptor = percent_cluster_receptors[interaction['ensembl{}'.format(suffixes[0])]]
-    percent_ligand = percent_cluster_ligands[interaction['ensembl{}'.format(suffixes[1])]]
-
-    if percent_receptor or percent_ligand:
-        interaction_percent = 0
-
-    else:
-        interaction_percent = 1
-
-    return interaction_percent
-
-
-def counts_percent(counts: pd.Series, threshold: float) -> int:
-    """
-    Calculates the number of positive values and divides it with the total.
-    If this value is < threshold, returns 1, else, returns 0
-
-
-    EXAMPLE:
-        INPUT:
-        counts = [0.1, 0.2, 0.3, 0.0]
-        threshold = 0.1
-
-        RESULT:
-
-        # 3/4 -> 0.75 not minor than 0.1
-        result = 0
-    """
-    total = len(counts)
-    positive = len(counts[counts > 0])
-
-    if positive / total < threshold:
-        return 1
-    else:
-        return 0
-
-
-def cluster_interaction_mean(cluster_interaction: tuple, interaction: pd.Series, clusters_means: dict,
-                             suffixes: tuple = ('_1', '_2')) -> float:
-    """
-    Calculates the mean value for two clusters.
-
-    Set 0 if one of both is 0
-    """
-
-    means_cluster_receptors = clusters_means[cluster_interaction[0]]
-    means_cluster_ligands = clusters_means[cluster_interaction[1]]
-
-    mean_receptor = means_cluster_receptors[interaction['ensembl{}'.format(suffixes[0])]]
-    mean_ligand = means_cluster_ligands[interaction['ensembl{}'.format(suffixes[1])]]
-
-    # if mean_receptor == 0 or mean_ligand == 0:
-    #     interaction_mean = 0
-    # else:
-    interaction_mean = (mean_receptor + mean_ligand) / 2
-
-    return interaction_mean
-
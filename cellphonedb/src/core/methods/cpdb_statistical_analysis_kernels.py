@@ -0,0 +1,48 @@
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, nogil=True)
+def shuffled_means_counts(shuffled_means: np.ndarray, real_means: np.ndarray) -> (
+        np.ndarray, np.ndarray, np.ndarray):
+    """
+    Counts, for each interaction and cluster interaction, the shuffled means that are not NaN, bigger and
+    smaller than the real mean in a single pass over the (iterations, interactions, cluster_interactions) array.
+
+    NaN shuffled means are never bigger or smaller than the real mean, so they only miss the total count.
+    """
+    iterations, interactions, cluster_interactions = shuffled_means.shape
+    total = np.zeros((interactions, cluster_interactions), dtype=np.int64)
+    bigger = np.zeros((interactions, cluster_interactions), dtype=np.int64)
+    smaller = np.zeros((interactions, cluster_interactions), dtype=np.int64)
+
+    for interaction in prange(interactions):
+        for iteration in range(iterations):
+            for cluster_interaction in range(cluster_interactions):
+                shuffled_mean = shuffled_means[iteration, interaction, cluster_interaction]
+                real_mean = real_means[interaction, cluster_interaction]
+                total[interaction, cluster_interaction] += shuffled_mean == shuffled_mean
+                bigger[interaction, cluster_interaction] += shuffled_mean > real_mean
+                smaller[interaction, cluster_interaction] += shuffled_mean < real_mean
+
+    return total, bigger, smaller
+
+
+@njit(nogil=True)
+def cluster_group_sums(counts_values: np.ndarray, labels: np.ndarray, labels_number: int) -> np.ndarray:
+    """
+    Sums the (genes, cells) counts of the cells of each label in a single pass as a (genes, labels) array.
+
+    Cells with a negative label are skipped. Runs one gene row at a time, so the counts are read contiguously
+    and the kernel can be called from several threads at once.
+    """
+    genes, cells = counts_values.shape
+    sums = np.zeros((genes, labels_number), dtype=counts_values.dtype)
+
+    for gene in range(genes):
+        for cell in range(cells):
+            label = labels[cell]
+            if label >= 0:
+                sums[gene, label] += counts_values[gene, cell]
+
+    return sums
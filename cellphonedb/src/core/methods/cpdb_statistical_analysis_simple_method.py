@@ -47,13 +47,16 @@ def call(meta: pd.DataFrame,
                                                                               cluster_interactions, base_result,
                                                                               suffixes=('_1', '_2'))
 
+    interactions_rows = cpdb_statistical_analysis_helper.get_interactions_rows(interactions_filtered,
+                                                                               clusters['gene_to_row'],
+                                                                               suffixes=('_1', '_2'))
+
     statistical_mean_analysis = cpdb_statistical_analysis_helper.shuffled_analysis(iterations, meta,
                                                                                    counts_filtered,
-                                                                                   interactions_filtered,
+                                                                                   interactions_rows,
                                                                                    cluster_interactions,
                                                                                    base_result,
-                                                                                   threads,
-                                                                                   suffixes=('_1', '_2'))
+                                                                                   threads)
 
     result_percent = cpdb_statistical_analysis_helper.build_percent_result(real_mean_analysis,
                                                                            real_percent_analysis,
@@ -74,7 +77,7 @@ def call(meta: pd.DataFrame,
 def build_results(interactions: pd.DataFrame,
                   real_mean_analysis: pd.DataFrame,
                   result_percent: pd.DataFrame,
-                  clusters_means: dict,
+                  clusters_means: pd.DataFrame,
                   result_precision: int
                   ) -> (pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame):
     core_logger.info('Building Simple results')
@@ -104,8 +107,7 @@ def build_results(interactions: pd.DataFrame,
     result_percent = result_percent.round(result_precision)
     real_mean_analysis = real_mean_analysis.round(result_precision)
     significant_means = significant_means.round(result_precision)
-    for key, cluster_means in clusters_means.items():
-        clusters_means[key] = cluster_means.round(result_precision)
+    clusters_means = clusters_means.round(result_precision)
 
     # Document 1
     pvalues_result = pd.concat([interactions_data_result, result_percent], axis=1, join='inner', sort=False)
@@ -128,7 +130,7 @@ def build_results(interactions: pd.DataFrame,
     return pvalues_result, means_result, significant_mean_result, mean_pvalue_result, deconvoluted_result
 
 
-def deconvoluted_result_build(clusters_means: dict, interactions: pd.DataFrame) -> pd.DataFrame:
+def deconvoluted_result_build(clusters_means: pd.DataFrame, interactions: pd.DataFrame) -> pd.DataFrame:
     deconvoluted_result_1 = pd.DataFrame()
     deconvoluted_result_2 = pd.DataFrame()
     deconvoluted_result_1[
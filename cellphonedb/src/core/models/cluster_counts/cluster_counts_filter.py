@@ -22,5 +22,5 @@ def filter_empty_cluster_counts(counts: pd.DataFrame, clusters_names: list) -> p
     if counts.empty:
         return counts
 
-    filtered_counts = counts[counts[clusters_names].apply(lambda row: row.sum() > 0, axis=1)]
+    filtered_counts = counts[counts[clusters_names].values.sum(axis=1) > 0]
     return filtered_counts
@@ -0,0 +1,194 @@
+import warnings
+from unittest import TestCase, mock, skipIf
+
+import numpy as np
+import pandas as pd
+
+from cellphonedb.src.core.methods import cpdb_statistical_analysis_helper
+
+
+class TestStatisticalAnalysisHelper(TestCase):
+    def test_get_significant_means(self):
+        real_mean_analysis = pd.DataFrame({'cluster1': [0.1, 2.0, 0.3],
+                                           'cluster2': [1.0, 0.1, 0.0],
+                                           'cluster3': [2.0, 0.2, 0.5]},
+                                          index=['ensembl1', 'ensembl2', 'ensembl3'])
+        result_percent = pd.DataFrame({'cluster1': [0.0, 0.04, 0.3],
+                                       'cluster2': [1.0, 0.03, 0.55],
+                                       'cluster3': [1.0, 0.62, 0.02]},
+                                      index=['ensembl1', 'ensembl2', 'ensembl3'])
+        expected_result = pd.DataFrame({'cluster1': [0.1, 2.0, np.nan],
+                                        'cluster2': [np.nan, 0.1, np.nan],
+                                        'cluster3': [np.nan, np.nan, 0.5]},
+                                       index=['ensembl1', 'ensembl2', 'ensembl3'])
+
+        result = cpdb_statistical_analysis_helper.get_significant_means(real_mean_analysis, result_percent)
+
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    def test_mean_analysis(self):
+        meta = pd.DataFrame({'cell_type': ['cluster1', 'cluster1', 'cluster2', 'cluster2'],
+                             'group': ['tumor', 'normal', 'tumor', 'normal']},
+                            index=['cell1', 'cell2', 'cell3', 'cell4'])
+        counts = pd.DataFrame({'cell1': [2.0, 1.0, 4.0],
+                               'cell2': [1.0, 1.0, 1.0],
+                               'cell3': [1.0, 8.0, 2.0],
+                               'cell4': [4.0, 2.0, 2.0]},
+                              index=['ensembl1', 'ensembl2', 'ensembl3'])
+        interactions = pd.DataFrame({'ensembl_1': ['ensembl1', 'ensembl2'],
+                                     'ensembl_2': ['ensembl2', 'ensembl3']})
+
+        clusters = cpdb_statistical_analysis_helper.build_clusters(meta, counts)
+        cluster_interactions = cpdb_statistical_analysis_helper.get_cluster_combinations(clusters['names'])
+        base_result = cpdb_statistical_analysis_helper.build_result_matrix(interactions, cluster_interactions)
+
+        result = cpdb_statistical_analysis_helper.mean_analysis(interactions, clusters, cluster_interactions,
+                                                                base_result)
+
+        # log2(tumor / normal) means: ensembl1 (1, -2), ensembl2 (0, 2), ensembl3 (2, 0)
+        expected_result = pd.DataFrame({'cluster1_cluster1': [0.5, 1.0],
+                                        'cluster1_cluster2': [1.5, 0.0],
+                                        'cluster2_cluster1': [-1.0, 2.0],
+                                        'cluster2_cluster2': [0.0, 1.0]},
+                                       index=interactions.index)
+
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    def test_percent_analysis(self):
+        meta = pd.DataFrame({'cell_type': ['cluster1', 'cluster1', 'cluster2', 'cluster2'],
+                             'group': ['tumor', 'normal', 'tumor', 'normal']},
+                            index=['cell1', 'cell2', 'cell3', 'cell4'])
+        counts = pd.DataFrame({'cell1': [0.0, 1.0, 0.0],
+                               'cell2': [0.0, 1.0, 0.0],
+                               'cell3': [0.0, 0.0, 2.0],
+                               'cell4': [1.0, 0.0, 2.0]},
+                              index=['ensembl1', 'ensembl2', 'ensembl3'])
+        interactions = pd.DataFrame({'ensembl_1': ['ensembl1', 'ensembl2'],
+                                     'ensembl_2': ['ensembl2', 'ensembl3']})
+
+        clusters = cpdb_statistical_analysis_helper.build_clusters(meta, counts)
+        cluster_interactions = cpdb_statistical_analysis_helper.get_cluster_combinations(clusters['names'])
+        base_result = cpdb_statistical_analysis_helper.build_result_matrix(interactions, cluster_interactions)
+
+        result = cpdb_statistical_analysis_helper.percent_analysis(clusters, 0.1, interactions, cluster_interactions,
+                                                                   base_result)
+
+        # Below threshold in both groups: ensembl1 (cluster1), ensembl2 (cluster2), ensembl3 (cluster1)
+        expected_result = pd.DataFrame({'cluster1_cluster1': [0.0, 0.0],
+                                        'cluster1_cluster2': [0.0, 1.0],
+                                        'cluster2_cluster1': [1.0, 0.0],
+                                        'cluster2_cluster2': [0.0, 0.0]},
+                                       index=interactions.index)
+
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    def test_counts_below_threshold(self):
+        counts = pd.DataFrame({'cell1': [0.0, 1.0], 'cell2': [0.0, 2.0]}, index=['ensembl1', 'ensembl2'])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            result = cpdb_statistical_analysis_helper.counts_below_threshold(counts, 0.1)
+            empty_result = cpdb_statistical_analysis_helper.counts_below_threshold(counts.iloc[:, :0], 0.1)
+
+        np.testing.assert_array_equal(result, [True, False])
+        np.testing.assert_array_equal(empty_result, [False, False])
+
+    def test_build_percent_result(self):
+        columns = ['cluster1_cluster1', 'cluster1_cluster2']
+        cluster_interactions = [('cluster1', 'cluster1'), ('cluster1', 'cluster2')]
+        interactions = pd.DataFrame({'ensembl_1': ['ensembl1', 'ensembl2', 'ensembl3', 'ensembl2'],
+                                     'ensembl_2': ['ensembl2', 'ensembl3', 'ensembl1', 'ensembl1']})
+        base_result = cpdb_statistical_analysis_helper.build_result_matrix(interactions, cluster_interactions)
+
+        real_mean_analysis = pd.DataFrame([[0.5, 0.4], [0.0, 0.2], [-0.3, np.nan], [0.7, 0.7]], columns=columns)
+        real_percents_analysis = pd.DataFrame([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0], [1.0, 1.0]], columns=columns)
+        statistical_mean_analysis = np.array([
+            [[0.6, 0.1], [0.0, 0.2], [-0.4, 0.1], [np.nan, 0.8]],
+            [[0.5, 0.4], [0.0, 0.6], [-0.1, 0.1], [np.nan, 0.1]],
+            [[0.1, 0.4], [0.0, np.nan], [-0.2, 0.1], [np.nan, 0.1]],
+            [[0.2, 0.4], [0.0, 0.1], [-0.5, 0.1], [np.nan, 0.1]],
+        ], dtype=np.float32)
+
+        result = cpdb_statistical_analysis_helper.build_percent_result(real_mean_analysis, real_percents_analysis,
+                                                                       statistical_mean_analysis, interactions,
+                                                                       cluster_interactions, base_result)
+
+        # All the shuffled means of interaction4 cluster1_cluster1 are empty, so it has no pvalue
+        expected_result = pd.DataFrame([[0.5, 1.0], [1.0, 2 / 3], [1.0, 1.0], [1.0, 0.5]], columns=columns)
+
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    def test_cluster_group_means(self):
+        counts_values = np.array([[1.0, 3.0, 2.0, 4.0, 5.0],
+                                  [0.0, 2.0, 0.0, 6.0, 7.0]])
+        cluster_labels = np.array([0, 0, 1, 1, 1])
+        group_labels = np.array([0, 0, 0, 1, -1])
+
+        result = cpdb_statistical_analysis_helper.cluster_group_means(counts_values, cluster_labels, group_labels, 2)
+
+        expected_result = np.array([[[2.0, np.nan], [2.0, 4.0]],
+                                    [[1.0, np.nan], [0.0, 6.0]]])
+
+        np.testing.assert_array_equal(result, expected_result)
+
+    @skipIf(cpdb_statistical_analysis_helper.cpdb_statistical_analysis_kernels is None, 'numba is not installed')
+    def test_shuffled_means_counts_kernel(self):
+        random_state = np.random.RandomState(0)
+        shuffled_means = random_state.normal(size=(20, 6, 4)).astype(np.float32)
+        shuffled_means[random_state.rand(20, 6, 4) < 0.3] = np.nan
+        shuffled_means[:, 0, 0] = np.nan
+        real_means = random_state.normal(size=(6, 4)).astype(np.float32)
+        real_means[1, 1] = np.nan
+        real_means[2, 2] = shuffled_means[3, 2, 2]
+
+        result = cpdb_statistical_analysis_helper.shuffled_means_counts(shuffled_means, real_means)
+        with mock.patch.object(cpdb_statistical_analysis_helper, 'cpdb_statistical_analysis_kernels', None):
+            expected_result = cpdb_statistical_analysis_helper.shuffled_means_counts(shuffled_means, real_means)
+
+        for result_counts, expected_counts in zip(result, expected_result):
+            np.testing.assert_array_equal(result_counts, expected_counts)
+
+    @skipIf(cpdb_statistical_analysis_helper.cpdb_statistical_analysis_kernels is None, 'numba is not installed')
+    def test_cluster_group_means_kernel(self):
+        random_state = np.random.RandomState(0)
+        counts_values = random_state.randint(0, 5, size=(8, 30)).astype(np.float32)
+        cluster_labels = random_state.randint(0, 3, size=30).astype(np.int8)
+        group_labels = random_state.randint(-1, 2, size=30).astype(np.int8)
+        # cluster 2 has no normal cells, so its normal means are NaN
+        group_labels[(cluster_labels == 2) & (group_labels == 1)] = 0
+
+        result = cpdb_statistical_analysis_helper.cluster_group_means(counts_values, cluster_labels, group_labels, 3)
+        with mock.patch.object(cpdb_statistical_analysis_helper, 'cpdb_statistical_analysis_kernels', None):
+            expected_result = cpdb_statistical_analysis_helper.cluster_group_means(counts_values, cluster_labels,
+                                                                                   group_labels, 3)
+
+        self.assertTrue(np.isnan(result[:, 2, 1]).all())
+        np.testing.assert_allclose(result, expected_result, rtol=1e-6)
+
+    def test_shuffled_analysis_threads(self):
+        random_state = np.random.RandomState(0)
+        cells = ['cell{}'.format(cell) for cell in range(12)]
+        meta = pd.DataFrame({'cell_type': ['cluster1', 'cluster2', 'cluster3'] * 4,
+                             'group': ['tumor', 'tumor', 'tumor', 'normal', 'normal', 'normal'] * 2},
+                            index=cells)
+        counts = pd.DataFrame(random_state.randint(0, 5, size=(3, 12)).astype(float), columns=cells,
+                              index=['ensembl1', 'ensembl2', 'ensembl3'])
+        interactions = pd.DataFrame({'ensembl_1': ['ensembl1', 'ensembl2'],
+                                     'ensembl_2': ['ensembl2', 'ensembl3']})
+
+        clusters = cpdb_statistical_analysis_helper.build_clusters(meta, counts)
+        cluster_interactions = cpdb_statistical_analysis_helper.get_cluster_combinations(clusters['names'])
+        base_result = cpdb_statistical_analysis_helper.build_result_matrix(interactions, cluster_interactions)
+        interactions_rows = cpdb_statistical_analysis_helper.get_interactions_rows(interactions,
+                                                                                   clusters['gene_to_row'])
+
+        results = []
+        for threads in [1, 4]:
+            np.random.seed(0)
+            results.append(cpdb_statistical_analysis_helper.shuffled_analysis(8, meta, counts, interactions_rows,
+                                                                              cluster_interactions, base_result,
+                                                                              threads))
+
+        self.assertEqual(results[0].shape, (8, 2, 9))
+        self.assertFalse(np.isnan(results[0]).all())
+        np.testing.assert_array_equal(results[0], results[1])
@@ -29,4 +29,7 @@ setup(
         'PyYAML>=3.13,<3.13.99',
         'requests>=2.19,<2.19.99',
     ],
+    extras_require={
+        'numba': ['numba>=0.40'],
+    },
 )